@@ -32,15 +32,17 @@ with SQLiteDatabase(database_file_path) as database:
         case False, sql:
             table_name, columns, count_rows, conditions = basic_parse_sql(sql)
 
-            result_iterator = database.query(
-                table_name.value,
-                selected_columns=columns,
-                conditions=conditions,
-                count_rows=count_rows,
-            )
-
-            for result in result_iterator:
-                if type(result) is int:
-                    print(result)
-                elif type(result) is list:
-                    print("|".join(result))
+            if count_rows:
+                print(database.count(table_name.value))
+            else:
+                output_buffer = bytearray()
+                for row in database.select(
+                    table_name.value,
+                    selected_columns=columns,
+                    conditions=conditions,
+                ):
+                    output_buffer += "|".join(row).encode()
+                    output_buffer += b"\n"
+
+                _ = sys.stdout.buffer.write(output_buffer)
+                sys.stdout.buffer.flush()
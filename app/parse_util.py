@@ -1,64 +1,215 @@
-from typing import cast
+import re
+import sys
+from functools import lru_cache
 
-import sqlparse
-from sqlparse.sql import Comparison, Function, Identifier, IdentifierList, Token, Where
-from sqlparse.tokens import Wildcard
+from .sqlite.sql_token import SqlToken, SqlTokenKind
 
+_KEYWORDS = {"SELECT", "FROM", "WHERE", "AND"}
+_SYMBOLS = {",", "=", "(", ")", ";"}
+_WHITESPACE = {" ", "\t", "\n", "\r"}
 
-def basic_parse_sql(sql: str):
-    sql_tokens: list[Token] = [
-        token
-        for token in cast(list[Token], sqlparse.parse(sql)[0].tokens)
-        if not token.is_whitespace and not token.is_newline
-    ]
-
-    select_token = token if (token := sql_tokens[0]).value.upper() == "SELECT" else None
-    if not select_token:
-        raise ValueError("Only SELECT statements allowed")
 
-    columns, count_rows = cast(list[str], []), False
-    if (token := sql_tokens[1]).ttype == Wildcard:
-        columns = [token.value]
-    elif isinstance(token := sql_tokens[1], Identifier):
-        columns.append(token.value)
-    elif isinstance(tokens := sql_tokens[1], IdentifierList):
-        for token in tokens.get_identifiers():
-            if not isinstance(token, Identifier):
-                raise ValueError(f"Token {token} in selection fields not allowed")
-        columns += [token.value for token in tokens.get_identifiers()]
-    elif isinstance(function := sql_tokens[1], Function):
-        count_rows = True
-    else:
+def _tokenize(sql: str) -> list[SqlToken]:
+    tokens: list[SqlToken] = []
+
+    position, sql_length = 0, len(sql)
+    while position < sql_length:
+        character = sql[position]
+
+        if character in _WHITESPACE:
+            position += 1
+        elif character == "'":
+            closing_position = sql.index("'", position + 1)
+            tokens.append(
+                SqlToken(SqlTokenKind.STRING, sql[position + 1 : closing_position])
+            )
+            position = closing_position + 1
+        elif character == '"':
+            closing_position = sql.index('"', position + 1)
+            tokens.append(
+                SqlToken(
+                    SqlTokenKind.IDENTIFIER,
+                    sys.intern(sql[position + 1 : closing_position]),
+                )
+            )
+            position = closing_position + 1
+        elif character == "*":
+            tokens.append(SqlToken(SqlTokenKind.WILDCARD, character))
+            position += 1
+        elif character == "?":
+            tokens.append(SqlToken(SqlTokenKind.PLACEHOLDER, character))
+            position += 1
+        elif character in _SYMBOLS:
+            tokens.append(SqlToken(SqlTokenKind.SYMBOL, character))
+            position += 1
+        elif character.isdigit():
+            end_position = position
+            while end_position < sql_length and sql[end_position].isdigit():
+                end_position += 1
+            tokens.append(SqlToken(SqlTokenKind.INTEGER, sql[position:end_position]))
+            position = end_position
+        elif character.isalnum() or character == "_":
+            end_position = position
+            while end_position < sql_length and (
+                sql[end_position].isalnum() or sql[end_position] == "_"
+            ):
+                end_position += 1
+
+            word = sql[position:end_position]
+            if word.upper() in _KEYWORDS:
+                tokens.append(SqlToken(SqlTokenKind.KEYWORD, word.upper()))
+            else:
+                tokens.append(SqlToken(SqlTokenKind.IDENTIFIER, sys.intern(word)))
+            position = end_position
+        else:
+            raise ValueError(f"Unexpected character {character!r} in SQL")
+
+    return tokens
+
+
+class _TokenStream:
+    def __init__(self, tokens: list[SqlToken]) -> None:
+        self._tokens: list[SqlToken] = tokens
+        self._position: int = 0
+
+    def peek(self) -> SqlToken | None:
+        if self._position < len(self._tokens):
+            return self._tokens[self._position]
+        return None
+
+    def advance(self) -> SqlToken:
+        token = self.peek()
+        if token is None:
+            raise ValueError("Unexpected end of SQL")
+
+        self._position += 1
+        return token
+
+    def expect(self, kind: SqlTokenKind, value: str | None = None) -> SqlToken:
+        token = self.advance()
+        if token.kind != kind or (value is not None and token.value != value):
+            raise ValueError(f"Expected {value or kind.value}, but got {token.value!r}")
+
+        return token
+
+
+def _parse_selection(stream: _TokenStream) -> tuple[list[str], bool]:
+    token = stream.advance()
+
+    if token.kind == SqlTokenKind.WILDCARD:
+        return [token.value], False
+
+    if token.kind == SqlTokenKind.IDENTIFIER and token.value.upper() == "COUNT":
+        _ = stream.expect(SqlTokenKind.SYMBOL, "(")
+        _ = stream.expect(SqlTokenKind.WILDCARD)
+        _ = stream.expect(SqlTokenKind.SYMBOL, ")")
+        return [], True
+
+    if token.kind != SqlTokenKind.IDENTIFIER:
         raise ValueError("Expected at least one column or *")
 
-    from_token = token if (token := sql_tokens[2]).value.upper() == "FROM" else None
-    if not from_token:
+    columns = [token.value]
+    while (next_token := stream.peek()) and next_token.value == ",":
+        _ = stream.advance()
+        columns.append(stream.expect(SqlTokenKind.IDENTIFIER).value)
+
+    return columns, False
+
+
+def _parse_condition_term(stream: _TokenStream) -> SqlToken:
+    token = stream.advance()
+    if token.kind not in [
+        SqlTokenKind.IDENTIFIER,
+        SqlTokenKind.STRING,
+        SqlTokenKind.INTEGER,
+        SqlTokenKind.PLACEHOLDER,
+    ]:
+        raise ValueError(f"Unsupported condition term {token.value!r}")
+
+    return token
+
+
+def _parse_conditions(stream: _TokenStream) -> list[tuple[SqlToken, SqlToken]]:
+    conditions: list[tuple[SqlToken, SqlToken]] = []
+
+    while True:
+        left = _parse_condition_term(stream)
+        _ = stream.expect(SqlTokenKind.SYMBOL, "=")
+        right = _parse_condition_term(stream)
+        conditions.append((left, right))
+
+        if (token := stream.peek()) and token.value == "AND":
+            _ = stream.advance()
+        else:
+            break
+
+    return conditions
+
+
+# INFO: Literal values are normalized to `?` so that structurally identical
+# queries share one cached parse result. Double-quoted spans are matched but
+# re-emitted untouched so digits inside quoted identifiers are not rewritten.
+_LITERAL_PATTERN = re.compile(r"\"[^\"]*\"|'[^']*'|\b\d+\b")
+
+
+def _normalize(sql: str) -> tuple[str, list[str]]:
+    literals: list[str] = []
+
+    def replace_literal(match: re.Match[str]) -> str:
+        matched = match.group(0)
+        if matched.startswith('"'):
+            return matched
+
+        literals.append(matched)
+        return "?"
+
+    return _LITERAL_PATTERN.sub(replace_literal, sql), literals
+
+
+def _bind_literal(raw_literal: str) -> SqlToken:
+    if raw_literal.startswith("'"):
+        return SqlToken(SqlTokenKind.STRING, raw_literal[1:-1])
+    return SqlToken(SqlTokenKind.INTEGER, raw_literal)
+
+
+@lru_cache(maxsize=256)
+def _parse_template(template: str):
+    stream = _TokenStream(_tokenize(template))
+
+    if (token := stream.peek()) is None or token.value != "SELECT":
+        raise ValueError("Only SELECT statements allowed")
+    _ = stream.advance()
+
+    columns, count_rows = _parse_selection(stream)
+
+    if (token := stream.peek()) is None or token.value != "FROM":
         raise ValueError("Missing FROM statement")
+    _ = stream.advance()
 
-    table_name = token if isinstance(token := sql_tokens[3], Identifier) else None
-    if not table_name:
-        raise ValueError("Table name is required")
-
-    conditions: list[tuple[Token, Token]] = []
-    if len(sql_tokens) > 4:
-        where_token = token if isinstance(token := sql_tokens[4], Where) else None
-        if where_token:
-            for condition in where_token.get_sublists():
-                if not isinstance(condition, Comparison):
-                    raise ValueError("Only comparison operations allowed in WHERE")
-
-                condition_tokens = list(
-                    token
-                    for token in cast(list[Token], condition.tokens)
-                    if not token.is_whitespace and not token.is_newline
-                )
-                if len(condition_tokens) != 3:
-                    raise ValueError(f"Unsupported condition type {condition}")
+    table_name = stream.expect(SqlTokenKind.IDENTIFIER)
+
+    conditions: list[tuple[SqlToken, SqlToken]] = []
+    if (token := stream.peek()) and token.value == "WHERE":
+        _ = stream.advance()
+        conditions = _parse_conditions(stream)
+
+    if (token := stream.peek()) and token.value != ";":
+        raise ValueError(f"Unexpected token {token.value!r} after query")
 
-                left, operation, right = condition_tokens
-                if operation.value != "=":
-                    raise ValueError("Only equals conditions are supported")
+    return table_name, tuple(columns), count_rows, tuple(conditions)
+
+
+def basic_parse_sql(sql: str):
+    template, literals = _normalize(sql)
+    table_name, columns, count_rows, conditions = _parse_template(template)
 
-                conditions.append((left, right))
+    literal_iterator = iter(literals)
+    bound_conditions: list[tuple[SqlToken, SqlToken]] = []
+    for left, right in conditions:
+        if left.kind == SqlTokenKind.PLACEHOLDER:
+            left = _bind_literal(next(literal_iterator))
+        if right.kind == SqlTokenKind.PLACEHOLDER:
+            right = _bind_literal(next(literal_iterator))
+        bound_conditions.append((left, right))
 
-    return table_name, columns, count_rows, conditions
+    return table_name, list(columns), count_rows, bound_conditions
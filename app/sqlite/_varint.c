@@ -0,0 +1,123 @@
+/* INFO: Optional C implementation of huffman_varint; build in place with
+ * `python setup.py build_ext --inplace`. utils.py falls back to the pure
+ * Python decoder when the extension has not been built. */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+static PyTypeObject HuffmanResultType;
+
+static PyStructSequence_Field huffman_result_fields[] = {
+    {"value", "decoded integer"},
+    {"length", "bytes consumed"},
+    {NULL, NULL},
+};
+
+static PyStructSequence_Desc huffman_result_desc = {
+    "HuffmanResult",
+    "Decoded SQLite varint as (value, length).",
+    huffman_result_fields,
+    2,
+};
+
+static PyObject *
+varint_huffman_varint(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    static char *keywords[] = {"buffer", "offset", NULL};
+
+    Py_buffer view;
+    Py_ssize_t offset = 0;
+    if (!PyArg_ParseTupleAndKeywords(
+            args, kwargs, "y*|n", keywords, &view, &offset)) {
+        return NULL;
+    }
+
+    uint64_t value = 0;
+    int length = 0;
+
+    if (offset >= 0 && offset < view.len) {
+        const unsigned char *bytes = (const unsigned char *)view.buf + offset;
+        Py_ssize_t available = view.len - offset;
+        int limit = available < 9 ? (int)available : 9;
+
+        for (int index = 0; index < limit; index++) {
+            unsigned char byte = bytes[index];
+
+            /* INFO: The ninth byte has no continuation flag - all 8 bits
+             * count. */
+            if (index == 8) {
+                value = (value << 8) | byte;
+                length = 9;
+                break;
+            }
+
+            value = (value << 7) | (byte & 0x7F);
+            if (byte < 0x80) {
+                length = index + 1;
+                break;
+            }
+        }
+    }
+
+    PyBuffer_Release(&view);
+
+    if (length == 0) {
+        PyErr_SetString(PyExc_ValueError, "Varint missing a terminator byte");
+        return NULL;
+    }
+
+    PyObject *result = PyStructSequence_New(&HuffmanResultType);
+    if (result == NULL) {
+        return NULL;
+    }
+
+    PyStructSequence_SET_ITEM(result, 0, PyLong_FromUnsignedLongLong(value));
+    PyStructSequence_SET_ITEM(result, 1, PyLong_FromLong(length));
+    if (PyErr_Occurred()) {
+        Py_DECREF(result);
+        return NULL;
+    }
+
+    return result;
+}
+
+static PyMethodDef varint_methods[] = {
+    {"huffman_varint",
+     (PyCFunction)(void (*)(void))varint_huffman_varint,
+     METH_VARARGS | METH_KEYWORDS,
+     "Decode a SQLite varint from buffer starting at offset."},
+    {NULL, NULL, 0, NULL},
+};
+
+static struct PyModuleDef varint_module = {
+    PyModuleDef_HEAD_INIT,
+    "_varint",
+    "C implementation of the SQLite varint decoder.",
+    -1,
+    varint_methods,
+};
+
+PyMODINIT_FUNC
+PyInit__varint(void)
+{
+    PyObject *module = PyModule_Create(&varint_module);
+    if (module == NULL) {
+        return NULL;
+    }
+
+    if (HuffmanResultType.tp_name == NULL
+        && PyStructSequence_InitType2(&HuffmanResultType, &huffman_result_desc)
+               < 0) {
+        Py_DECREF(module);
+        return NULL;
+    }
+
+    Py_INCREF(&HuffmanResultType);
+    if (PyModule_AddObject(
+            module, "HuffmanResult", (PyObject *)&HuffmanResultType) < 0) {
+        Py_DECREF(&HuffmanResultType);
+        Py_DECREF(module);
+        return NULL;
+    }
+
+    return module;
+}
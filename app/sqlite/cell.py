@@ -1,105 +1,133 @@
+import struct
 from dataclasses import dataclass
 
-from .utils import BytesOffsetArray, huffman_varint
+from .utils import huffman_varint
+
+_UINT32 = struct.Struct(">I")
+_uint32_at = _UINT32.unpack_from
 
 
 def _extract_data_with_overflow(
-    cell_bytes: BytesOffsetArray,
+    page_view: memoryview,
     cell_data_start: int,
+    cell_end: int,
     full_payload_size: int,
-) -> tuple[bytes, int | None]:
-    cell_data_size = len(cell_bytes) - cell_data_start
+) -> tuple[memoryview, int | None]:
+    cell_data_size = cell_end - cell_data_start
 
     if cell_data_size >= full_payload_size:
-        initial_data = cell_bytes.subbytes(
-            offset=cell_data_start,
-            length=full_payload_size,
-        )
+        initial_data = page_view[cell_data_start : cell_data_start + full_payload_size]
 
         return (initial_data, None)
     else:
-        initial_data = cell_bytes[cell_data_start:-4]
-        overflow_page = int.from_bytes(
-            cell_bytes[-4:],
-            byteorder="big",
-            signed=False,
-        )
+        initial_data = page_view[cell_data_start : cell_end - 4]
+        overflow_page = _uint32_at(page_view, cell_end - 4)[0]
 
         return (initial_data, overflow_page)
 
 
-@dataclass
+# INFO: (payload_size, row_id, initial_payload, overflow_page) - the packed
+# form yielded on scan hot paths to avoid one object per cell.
+TableLeafCellRaw = tuple[int, int, memoryview, int | None]
+
+
+@dataclass(slots=True)
 class TableBTreeLeafCell:
     payload_size: int
     row_id: int
-    initial_payload: BytesOffsetArray
+    initial_payload: memoryview
     overflow_page: int | None
 
     @staticmethod
-    def create(cell_bytes: BytesOffsetArray):
-        raw_size_bytes = cell_bytes.subbytes(offset=0, length=9)
-        total_size_varint = huffman_varint(raw_size_bytes)
+    def parse_raw(
+        page_view: memoryview, cell_start: int, cell_end: int
+    ) -> TableLeafCellRaw:
+        total_size_varint = huffman_varint(page_view, cell_start)
+
+        rowid_start = cell_start + total_size_varint.length
+        rowid_varint = huffman_varint(page_view, rowid_start)
+
+        payload_size = total_size_varint.value
+        cell_data_start = rowid_start + rowid_varint.length
+
+        # INFO: Almost every cell fits its page; skip the overflow helper then.
+        if cell_end - cell_data_start >= payload_size:
+            return (
+                payload_size,
+                rowid_varint.value,
+                page_view[cell_data_start : cell_data_start + payload_size],
+                None,
+            )
 
-        raw_rowid_bytes = cell_bytes.subbytes(
-            offset=(total_size_varint.length),
-            length=9,
+        initial_data, overflow_page = _extract_data_with_overflow(
+            page_view,
+            cell_data_start=cell_data_start,
+            cell_end=cell_end,
+            full_payload_size=payload_size,
         )
-        rowid_varint = huffman_varint(raw_rowid_bytes)
 
-        initial_data, overflow_page = _extract_data_with_overflow(
-            cell_bytes,
-            cell_data_start=total_size_varint.length + rowid_varint.length,
-            full_payload_size=total_size_varint.value,
+        return (payload_size, rowid_varint.value, initial_data, overflow_page)
+
+    @staticmethod
+    def create(page_view: memoryview, cell_start: int, cell_end: int):
+        payload_size, row_id, initial_payload, overflow_page = (
+            TableBTreeLeafCell.parse_raw(page_view, cell_start, cell_end)
         )
 
         return TableBTreeLeafCell(
-            payload_size=total_size_varint.value,
-            row_id=rowid_varint.value,
-            initial_payload=BytesOffsetArray(initial_data),
+            payload_size=payload_size,
+            row_id=row_id,
+            initial_payload=initial_payload,
             overflow_page=overflow_page,
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class IndexBTreeLeafCell:
     payload_size: int
-    initial_payload: BytesOffsetArray
+    initial_payload: memoryview
     overflow_page: int | None
 
     @staticmethod
-    def create(cell_bytes: BytesOffsetArray):
-        raw_size_bytes = cell_bytes.subbytes(offset=0, length=9)
-        total_size_varint = huffman_varint(raw_size_bytes)
+    def create(page_view: memoryview, cell_start: int, cell_end: int):
+        total_size_varint = huffman_varint(page_view, cell_start)
+
+        payload_size = total_size_varint.value
+        cell_data_start = cell_start + total_size_varint.length
+
+        if cell_end - cell_data_start >= payload_size:
+            return IndexBTreeLeafCell(
+                payload_size=payload_size,
+                initial_payload=page_view[
+                    cell_data_start : cell_data_start + payload_size
+                ],
+                overflow_page=None,
+            )
 
         initial_data, overflow_page = _extract_data_with_overflow(
-            cell_bytes,
-            cell_data_start=total_size_varint.length,
-            full_payload_size=total_size_varint.value,
+            page_view,
+            cell_data_start=cell_data_start,
+            cell_end=cell_end,
+            full_payload_size=payload_size,
         )
 
         return IndexBTreeLeafCell(
-            payload_size=total_size_varint.value,
-            initial_payload=BytesOffsetArray(initial_data),
+            payload_size=payload_size,
+            initial_payload=initial_data,
             overflow_page=overflow_page,
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class TableBTreeInteriorCell:
     left_pointer: int
     integer_key: int
 
     @staticmethod
-    def create(cell_bytes: BytesOffsetArray):
-        raw_left_pointer_bytes = cell_bytes[:4]
-        left_pointer = int.from_bytes(
-            raw_left_pointer_bytes,
-            byteorder="big",
-            signed=False,
-        )
+    def create(page_view: memoryview, cell_start: int, cell_end: int):
+        left_pointer = _uint32_at(page_view, cell_start)[0]
 
-        raw_key_bytes = cell_bytes.subbytes(offset=4, length=9)
-        key_varint = huffman_varint(raw_key_bytes)
+        key_varint = huffman_varint(page_view, cell_start + 4)
 
         return TableBTreeInteriorCell(
             left_pointer=left_pointer,
@@ -107,35 +135,43 @@ class TableBTreeInteriorCell:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class IndexBTreeInteriorCell:
     left_pointer: int
     payload_size: int
-    initial_payload: BytesOffsetArray
+    initial_payload: memoryview
     overflow_page: int | None
 
     @staticmethod
-    def create(cell_bytes: BytesOffsetArray):
-        raw_left_pointer_bytes = cell_bytes[:4]
-        left_pointer = int.from_bytes(
-            raw_left_pointer_bytes,
-            byteorder="big",
-            signed=False,
-        )
+    def create(page_view: memoryview, cell_start: int, cell_end: int):
+        left_pointer = _uint32_at(page_view, cell_start)[0]
+
+        total_size_varint = huffman_varint(page_view, cell_start + 4)
+
+        payload_size = total_size_varint.value
+        cell_data_start = cell_start + 4 + total_size_varint.length
 
-        raw_size_bytes = cell_bytes.subbytes(offset=4, length=9)
-        total_size_varint = huffman_varint(raw_size_bytes)
+        if cell_end - cell_data_start >= payload_size:
+            return IndexBTreeInteriorCell(
+                left_pointer=left_pointer,
+                payload_size=payload_size,
+                initial_payload=page_view[
+                    cell_data_start : cell_data_start + payload_size
+                ],
+                overflow_page=None,
+            )
 
         initial_data, overflow_page = _extract_data_with_overflow(
-            cell_bytes,
-            cell_data_start=total_size_varint.length + 4,
-            full_payload_size=total_size_varint.value,
+            page_view,
+            cell_data_start=cell_data_start,
+            cell_end=cell_end,
+            full_payload_size=payload_size,
         )
 
         return IndexBTreeInteriorCell(
             left_pointer=left_pointer,
-            payload_size=total_size_varint.value,
-            initial_payload=BytesOffsetArray(initial_data),
+            payload_size=payload_size,
+            initial_payload=initial_data,
             overflow_page=overflow_page,
         )
 
@@ -1,25 +1,27 @@
-from collections.abc import Iterator
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
 from types import TracebackType
-from typing import BinaryIO, cast, final
+from typing import cast, final
 
+import mmap
+import os
 import re
+import struct
 
-from os import fstat, PathLike
-
-import sqlparse
-from sqlparse.sql import Function, Identifier, IdentifierList, Parenthesis, Token
-from sqlparse.tokens import Literal
+from bisect import bisect_right
+from os import PathLike
 
+from .sql_token import SqlToken, SqlTokenKind
 from .schema import SchemaObject
 from .record import Record, SerialType, parse_records
 from .cell import (
     IndexBTreeInteriorCell,
     IndexBTreeLeafCell,
     TableBTreeInteriorCell,
-    TableBTreeLeafCell,
+    TableLeafCellRaw,
 )
 from .page import BTreePage, OverflowPage, PageType
-from .utils import BytesOffsetArray, OffsetMetadata
+from .utils import be_int
 
 
 @final
@@ -27,49 +29,89 @@ class HeaderOffset:
     SQLITE_MAGIC_STRING = b"SQLite format 3\x00"
 
     # INFO: https://www.sqlite.org/fileformat.html#the_database_header
-    HEADER_STRING = OffsetMetadata(OFFSET=0, SIZE=16)
-    PAGE_SIZE = OffsetMetadata(OFFSET=16, SIZE=2)
-    FILE_WRITE_FORMAT = OffsetMetadata(OFFSET=18, SIZE=1)
-    FILE_READ_FORMAT = OffsetMetadata(OFFSET=19, SIZE=1)
-    PAGE_RESERVED_BYTES = OffsetMetadata(OFFSET=20, SIZE=1)
-    MAX_EMBEDDED_PAYLOAD_FRACTION = OffsetMetadata(OFFSET=21, SIZE=1)
-    MIN_EMBEDDED_PAYLOAD_FRACTION = OffsetMetadata(OFFSET=22, SIZE=1)
-    LEAF_PAYLOAD_FRACTION = OffsetMetadata(OFFSET=23, SIZE=1)
-    FILE_CHANGE_COUNTER = OffsetMetadata(OFFSET=24, SIZE=4)
-    FILE_SIZE_IN_PAGES = OffsetMetadata(OFFSET=28, SIZE=4)
-    FIRST_FREELIST_TRUNK_PAGE_NUMBER = OffsetMetadata(OFFSET=32, SIZE=4)
-    TOTAL_FREELIST_PAGES = OffsetMetadata(OFFSET=36, SIZE=4)
-    SCHEMA_COOKIE = OffsetMetadata(OFFSET=40, SIZE=4)
-    SCHEMA_FORMAT_NUMBER = OffsetMetadata(OFFSET=44, SIZE=4)
-    DEFAULT_PAGE_CACHE_SIZE = OffsetMetadata(OFFSET=48, SIZE=4)
-    LARGEST_BTREE_ROOT_PAGE_NUMBER = OffsetMetadata(OFFSET=52, SIZE=4)
-    DATABASE_TEXT_ENCODING = OffsetMetadata(OFFSET=56, SIZE=4)
+    # Each field is its (start, end) byte range.
+    HEADER_STRING = (0, 16)
+    PAGE_SIZE = (16, 18)
+    FILE_WRITE_FORMAT = (18, 19)
+    FILE_READ_FORMAT = (19, 20)
+    PAGE_RESERVED_BYTES = (20, 21)
+    MAX_EMBEDDED_PAYLOAD_FRACTION = (21, 22)
+    MIN_EMBEDDED_PAYLOAD_FRACTION = (22, 23)
+    LEAF_PAYLOAD_FRACTION = (23, 24)
+    FILE_CHANGE_COUNTER = (24, 28)
+    FILE_SIZE_IN_PAGES = (28, 32)
+    FIRST_FREELIST_TRUNK_PAGE_NUMBER = (32, 36)
+    TOTAL_FREELIST_PAGES = (36, 40)
+    SCHEMA_COOKIE = (40, 44)
+    SCHEMA_FORMAT_NUMBER = (44, 48)
+    DEFAULT_PAGE_CACHE_SIZE = (48, 52)
+    LARGEST_BTREE_ROOT_PAGE_NUMBER = (52, 56)
+    DATABASE_TEXT_ENCODING = (56, 60)
     # TODO: Add the missing ones
 
 
+# INFO: Covers the HeaderOffset table up to DATABASE_TEXT_ENCODING; the magic
+# string, the page size, six 1-byte format fields and nine 4-byte fields.
+_DATABASE_HEADER = struct.Struct(">16sH6B9I")
+
+_IDENTIFIER_PATTERN = re.compile(r'"([^"]+)"|\[([^\]]+)\]|`([^`]+)`|(\w+)')
+
+
+def _split_definitions(create_sql: str) -> list[str]:
+    # INFO: The only grammar needed from a CREATE statement is its
+    # parenthesized definition list split on top-level commas; tracking
+    # quote state and paren depth is enough for that.
+    block = create_sql[create_sql.index("(") + 1 : create_sql.rindex(")")]
+
+    definitions: list[str] = []
+    depth = 0
+    quote = ""
+    start = 0
+    for position, character in enumerate(block):
+        if quote:
+            if character == quote:
+                quote = ""
+        elif character in "'\"`":
+            quote = character
+        elif character == "(":
+            depth += 1
+        elif character == ")":
+            depth -= 1
+        elif character == "," and depth == 0:
+            definitions.append(block[start:position])
+            start = position + 1
+
+    definitions.append(block[start:])
+    return definitions
+
+
+def _leading_identifier(definition: str) -> str:
+    match = _IDENTIFIER_PATTERN.search(definition)
+    if match is None:
+        raise ValueError(f"Unable to parse definition {definition!r}")
+
+    return next(group for group in match.groups() if group is not None)
+
+
 class SQLiteHeader:
     def __init__(self, header_bytes: bytes) -> None:
-        self._header_bytes: BytesOffsetArray = BytesOffsetArray(header_bytes)
-
-    @property
-    def page_size(self) -> int:
-        raw_bytes = self._header_bytes.subbytes(
-            offset=HeaderOffset.PAGE_SIZE.OFFSET,
-            length=HeaderOffset.PAGE_SIZE.SIZE,
-        )
+        fields = _DATABASE_HEADER.unpack_from(header_bytes)
 
-        page_size = int.from_bytes(raw_bytes, byteorder="big", signed=False)
+        page_size = fields[1]
         # INFO: Value 1 represents a page size of 65536
         if page_size == 1:
             page_size = 65536
-
         self._validate_page_size(page_size)
-        return page_size
+
+        self.page_size: int = page_size
+        self.encoding: str = self._decode_encoding(fields[16])
 
     def _validate_page_size(self, page_size: int):
-        if page_size < 512 or page_size > 32768:
+        # INFO: 65536 is a valid SQLite page size (stored as 1 in the
+        # header); larger pages mean fewer page reads per B-tree descent.
+        if page_size < 512 or page_size > 65536:
             raise ValueError(
-                f"Page size is {page_size}, but it needs in range [512, 32768]"
+                f"Page size is {page_size}, but it needs in range [512, 65536]"
             )
 
         while page_size > 512:
@@ -77,14 +119,7 @@ class SQLiteHeader:
             if remainder != 0:
                 raise ValueError("Page size needs to be a power of 2")
 
-    @property
-    def encoding(self) -> str:
-        raw_bytes = self._header_bytes.subbytes(
-            offset=HeaderOffset.DATABASE_TEXT_ENCODING.OFFSET,
-            length=HeaderOffset.DATABASE_TEXT_ENCODING.SIZE,
-        )
-
-        encoding_value = int.from_bytes(raw_bytes, byteorder="big", signed=False)
+    def _decode_encoding(self, encoding_value: int) -> str:
         match encoding_value:
             case 1:
                 return "utf-8"
@@ -98,15 +133,60 @@ class SQLiteHeader:
 
 class SQLiteDatabase:
     def __init__(self, file_path: str | PathLike[str]) -> None:
-        self._file: BinaryIO = cast(BinaryIO, open(file_path, "rb"))
+        self._fd: int = os.open(file_path, os.O_RDONLY)
 
-        magic_file_header = self._file.read(HeaderOffset.HEADER_STRING.SIZE)
-        if magic_file_header != HeaderOffset.SQLITE_MAGIC_STRING:
-            self._file.close()
+        try:
+            self._mm: mmap.mmap = mmap.mmap(
+                self._fd,
+                0,
+                access=mmap.ACCESS_READ,
+            )
+        except ValueError as error:
+            os.close(self._fd)
+            raise ValueError(
+                "File is probably not a SQLite database - incorrect header"
+            ) from error
+
+        # INFO: B-tree descent touches pages all over the file; tell the
+        # kernel not to waste bandwidth on sequential readahead.
+        if hasattr(mmap, "MADV_RANDOM"):
+            self._mm.madvise(mmap.MADV_RANDOM)
+
+        magic_start, magic_end = HeaderOffset.HEADER_STRING
+        if self._mm[magic_start:magic_end] != HeaderOffset.SQLITE_MAGIC_STRING:
+            self._mm.close()
+            os.close(self._fd)
             raise ValueError(
                 "File is probably not a SQLite database - incorrect header"
             )
 
+        try:
+            self._header: SQLiteHeader = SQLiteHeader(self._mm[:100])
+        except ValueError:
+            self._mm.close()
+            os.close(self._fd)
+            raise
+
+        # INFO: Exported only after validation; an outstanding view would
+        # turn the failure paths' mm.close() into a BufferError.
+        self._file_view: memoryview = memoryview(self._mm)
+        self._page_size: int = self._header.page_size
+        self._encoding: str = self._header.encoding
+
+        # INFO: The mapping is private and read-only, so the size is fixed
+        # for the lifetime of this object; no fstat per page access.
+        self._pages_count: int = len(self._mm) // self._page_size
+
+        # INFO: The file is opened read-only, so the catalog never changes.
+        self._schema_cache: list[SchemaObject] | None = None
+
+        self._page_cache: OrderedDict[int, BTreePage] = OrderedDict()
+        self._page_cache_capacity: int = 256
+
+        self._column_layout_cache: dict[
+            tuple[str, tuple[str, ...]], tuple[list[str], list[int]]
+        ] = {}
+
     def __enter__(self):
         return self
 
@@ -116,200 +196,322 @@ class SQLiteDatabase:
         exception_value: BaseException | None,
         exception_traceback: TracebackType | None,
     ):
-        self._file.close()
+        # INFO: Cached pages keep views into the mapping alive; drop them
+        # before closing or mmap refuses with "exported pointers exist".
+        self._page_cache.clear()
+        self._file_view.release()
+        try:
+            self._mm.close()
+        except BufferError:
+            # INFO: A caller still holds a record view; the mapping is
+            # reclaimed when the last view is garbage-collected.
+            pass
+        os.close(self._fd)
 
     def header(self) -> SQLiteHeader:
-        _ = self._file.seek(0)
-        header_bytes = self._file.read(100)
-
-        return SQLiteHeader(header_bytes)
-
-    @property
-    def _pages_count(self) -> int:
-        file_size = fstat(self._file.fileno()).st_size
-        return file_size // self.header().page_size
+        return self._header
 
-    def _read_page_data(self, page_number: int) -> bytes:
+    def _read_page_data(self, page_number: int) -> memoryview:
         if page_number < 1:
             raise ValueError("Pages are numbered from 1")
         if page_number > (count := self._pages_count):
             raise ValueError(f"Max page number is {count}, but {page_number} requested")
 
-        page_size = self.header().page_size
+        page_size = self._page_size
         absolute_page_start = page_size * (page_number - 1)
 
-        _ = self._file.seek(absolute_page_start)
-        page_bytes = self._file.read(page_size)
-
-        return page_bytes
+        return self._file_view[absolute_page_start : absolute_page_start + page_size]
 
     def _btree_page(self, page_number: int) -> BTreePage:
+        if (page := self._page_cache.get(page_number)) is not None:
+            self._page_cache.move_to_end(page_number)
+            return page
+
         page_data = self._read_page_data(page_number)
-        return BTreePage(page_data=page_data, page_number=page_number)
+        page = BTreePage(page_data=page_data, page_number=page_number)
+
+        self._page_cache[page_number] = page
+        if len(self._page_cache) > self._page_cache_capacity:
+            _ = self._page_cache.popitem(last=False)
+
+        return page
 
     def _overflow_page(self, page_number: int) -> OverflowPage:
         page_data = self._read_page_data(page_number)
         return OverflowPage(page_data=page_data)
 
+    def _prefetch_pages(self, page_numbers: Iterable[int]) -> None:
+        # INFO: madvise is Linux-only; elsewhere this is a no-op.
+        if not hasattr(mmap, "MADV_WILLNEED"):
+            return
+
+        page_size = self._page_size
+        mapping_size = len(self._mm)
+        for page_number in sorted(page_numbers):
+            # INFO: madvise offsets must be multiples of the system page
+            # size, which SQLite pages smaller than it are not; round the
+            # start down and widen the hint to keep the range covered.
+            start = page_size * (page_number - 1)
+            misalignment = start % mmap.PAGESIZE
+            start -= misalignment
+            self._mm.madvise(
+                mmap.MADV_WILLNEED,
+                start,
+                min(page_size + misalignment, mapping_size - start),
+            )
+
     def _table_cells_tree(
         self,
         starting_page_number: int,
-    ) -> Iterator[TableBTreeLeafCell]:
-        page = self._btree_page(page_number=starting_page_number)
-
-        match page.header.page_type:
-            case PageType.INTERIOR_TABLE:
-                interior_cells = cast(Iterator[TableBTreeInteriorCell], page.cells())
-                for cell in interior_cells:
-                    yield from self._table_cells_tree(cell.left_pointer)
-
-                right_page_number = cast(int, page.header.right_most_pointer)
-                yield from self._table_cells_tree(right_page_number)
-            case PageType.LEAF_TABLE:
-                leaf_cells = cast(Iterator[TableBTreeLeafCell], page.cells())
-                yield from leaf_cells
-            case _:
-                raise ValueError
+    ) -> Iterator[TableLeafCellRaw]:
+        page_stack = [starting_page_number]
+
+        while page_stack:
+            page = self._btree_page(page_number=page_stack.pop())
+
+            match page.header.page_type:
+                case PageType.INTERIOR_TABLE:
+                    interior_cells = cast(list[TableBTreeInteriorCell], list(page.cells()))
+
+                    right_page_number = cast(int, page.header.right_most_pointer)
+                    child_pages = [cell.left_pointer for cell in interior_cells]
+                    child_pages.append(right_page_number)
+                    self._prefetch_pages(child_pages)
+
+                    page_stack.append(right_page_number)
+                    page_stack.extend(
+                        cell.left_pointer for cell in reversed(interior_cells)
+                    )
+                case PageType.LEAF_TABLE:
+                    yield from page.leaf_cells_raw()
+                case _:
+                    raise ValueError
 
     def _row_ids_from_index(
         self,
         page_number: int,
         lookup_value: bytes,
     ) -> Iterator[int]:
-        page = self._btree_page(page_number=page_number)
+        # INFO: An explicit stack of (emit-row-id | visit-page) work items
+        # replaces generator recursion; each yield in a `yield from` chain
+        # resumes one frame per tree level, so a flat loop saves that
+        # per-row walk. Items are pushed in reverse so in-order emission
+        # (left subtree, then the interior cell's own row id) is preserved.
+        work_stack: list[tuple[bool, int]] = [(False, page_number)]
+
+        while work_stack:
+            is_row_id, value = work_stack.pop()
+            if is_row_id:
+                yield value
+                continue
 
-        match page.header.page_type:
-            case PageType.INTERIOR_INDEX:
-                interior_cells = cast(Iterator[IndexBTreeInteriorCell], page.cells())
+            page = self._btree_page(page_number=value)
 
-                for cell in interior_cells:
-                    payload = self._load_full_payload(cell)
-                    row_records = parse_records(payload)
+            match page.header.page_type:
+                case PageType.INTERIOR_INDEX:
+                    interior_cells = cast(
+                        Iterator[IndexBTreeInteriorCell], page.cells()
+                    )
 
-                    if lookup_value == row_records[0].data:
-                        yield from self._row_ids_from_index(
-                            cell.left_pointer,
-                            lookup_value,
+                    pending: list[tuple[bool, int]] = []
+                    descended_early = False
+                    for cell in interior_cells:
+                        payload = self._load_full_payload(
+                            cell.payload_size,
+                            cell.initial_payload,
+                            cell.overflow_page,
                         )
-                        yield int.from_bytes(
-                            row_records[1].data,
-                            byteorder="big",
-                            signed=False,
+                        row_records = parse_records(payload)
+
+                        # INFO: memoryview has no ordering; materialize the
+                        # key for the < comparison below.
+                        index_key = bytes(row_records[0].data)
+                        if lookup_value == index_key:
+                            pending.append((False, cell.left_pointer))
+                            pending.append((True, be_int(row_records[1].data)))
+                        elif lookup_value < index_key:
+                            pending.append((False, cell.left_pointer))
+                            descended_early = True
+                            break
+
+                    if not descended_early and (
+                        right_pointer := page.header.right_most_pointer
+                    ):
+                        pending.append((False, right_pointer))
+
+                    work_stack.extend(reversed(pending))
+
+                case PageType.LEAF_INDEX:
+                    leaf_cells = cast(Iterator[IndexBTreeLeafCell], page.cells())
+                    for cell in leaf_cells:
+                        payload = self._load_full_payload(
+                            cell.payload_size,
+                            cell.initial_payload,
+                            cell.overflow_page,
                         )
-                    elif lookup_value < row_records[0].data:
-                        yield from self._row_ids_from_index(
-                            cell.left_pointer,
-                            lookup_value,
+                        row_records = parse_records(payload)
+
+                        if row_records[0].data == lookup_value:
+                            yield be_int(row_records[1].data)
+
+                case _:
+                    raise ValueError
+
+    def _records_by_row_ids_batch(
+        self, starting_page_number: int, sorted_row_ids: list[int]
+    ) -> Iterator[TableLeafCellRaw]:
+        # INFO: One descent resolves the whole sorted batch: interior keys
+        # partition the id range across children, so each page along the way
+        # is visited once regardless of how many ids fall below it.
+        if not sorted_row_ids:
+            return
+
+        page_stack: list[tuple[int, int, int]] = [
+            (starting_page_number, 0, len(sorted_row_ids))
+        ]
+        while page_stack:
+            page_number, low, high = page_stack.pop()
+            page = self._btree_page(page_number=page_number)
+
+            match page.header.page_type:
+                case PageType.INTERIOR_TABLE:
+                    if high - low == 1:
+                        # INFO: A partition down to one id needs no range
+                        # split; the page's key binary search picks the
+                        # child without decoding every interior cell.
+                        page_stack.append(
+                            (
+                                page.child_page_for_row_id(sorted_row_ids[low]),
+                                low,
+                                high,
+                            )
                         )
-                        break
-                else:
-                    if right_pointer := page.header.right_most_pointer:
-                        yield from self._row_ids_from_index(right_pointer, lookup_value)
-
-            case PageType.LEAF_INDEX:
-                leaf_cells = cast(Iterator[IndexBTreeLeafCell], page.cells())
-                for cell in leaf_cells:
-                    payload = self._load_full_payload(cell)
-                    row_records = parse_records(payload)
-
-                    if row_records[0].data == lookup_value:
-                        yield int.from_bytes(
-                            row_records[1].data,
-                            byteorder="big",
-                            signed=False,
+                        continue
+
+                    pending: list[tuple[int, int, int]] = []
+                    for cell in cast(
+                        Iterator[TableBTreeInteriorCell], page.cells()
+                    ):
+                        if low >= high:
+                            break
+
+                        split = bisect_right(
+                            sorted_row_ids, cell.integer_key, low, high
                         )
+                        if split > low:
+                            pending.append((cell.left_pointer, low, split))
+                        low = split
 
-            case _:
-                raise ValueError
+                    if low < high:
+                        pending.append(
+                            (cast(int, page.header.right_most_pointer), low, high)
+                        )
 
-    def _records_by_row_id(
-        self, starting_page_number: int, row_id: int
-    ) -> TableBTreeLeafCell | None:
-        page = self._btree_page(page_number=starting_page_number)
-
-        match page.header.page_type:
-            case PageType.INTERIOR_TABLE:
-                interior_cells = cast(Iterator[TableBTreeInteriorCell], page.cells())
-                for cell in interior_cells:
-                    if row_id <= cell.integer_key:
-                        return self._records_by_row_id(cell.left_pointer, row_id)
-                else:
-                    right_page_number = cast(int, page.header.right_most_pointer)
-                    return self._records_by_row_id(right_page_number, row_id)
-            case PageType.LEAF_TABLE:
-                leaf_cells = cast(Iterator[TableBTreeLeafCell], page.cells())
-                for cell in leaf_cells:
-                    if cell.row_id == row_id:
-                        return cell
-
-                return None
-            case _:
-                raise ValueError
+                    page_stack.extend(reversed(pending))
+                case PageType.LEAF_TABLE:
+                    position = low
+                    for leaf_cell in page.leaf_cells_raw():
+                        row_id = leaf_cell[1]
+                        while position < high and sorted_row_ids[position] < row_id:
+                            position += 1
+                        if position >= high:
+                            break
+                        if sorted_row_ids[position] == row_id:
+                            yield leaf_cell
+                            position += 1
+                case _:
+                    raise ValueError
 
     def _load_full_payload(
         self,
-        leaf_cell: TableBTreeLeafCell | IndexBTreeInteriorCell | IndexBTreeLeafCell,
+        payload_size: int,
+        initial_payload: memoryview,
+        overflow_page_number: int | None,
     ):
-        remaining_bytes = leaf_cell.payload_size - len(leaf_cell.initial_payload)
-
-        full_payload = leaf_cell.initial_payload
-        next_overflow_page = leaf_cell.overflow_page
+        # INFO: The common case has no overflow chain; hand the cell's own
+        # payload back without assembling (and copying) anything.
+        if overflow_page_number is None:
+            if payload_size != len(initial_payload):
+                raise ValueError(
+                    f"Expected {payload_size}, but got {len(initial_payload)}"
+                )
+            return initial_payload
+
+        remaining_bytes = payload_size - len(initial_payload)
+
+        payload_chunks = [initial_payload]
+        next_overflow_page = overflow_page_number
+
+        if hasattr(mmap, "MADV_WILLNEED"):
+            # INFO: Overflow chains are usually allocated contiguously, so one
+            # readahead hint spanning the whole chain lets the kernel fetch
+            # pages while we walk the linked list.
+            page_size = self._page_size
+            chain_pages_bound = -(-remaining_bytes // page_size) + 1
+            # INFO: Same alignment constraint as _prefetch_pages: round the
+            # hint start down to the system page size and widen the length.
+            start = page_size * (next_overflow_page - 1)
+            misalignment = start % mmap.PAGESIZE
+            start -= misalignment
+            self._mm.madvise(
+                mmap.MADV_WILLNEED,
+                start,
+                min(
+                    page_size * chain_pages_bound + misalignment,
+                    len(self._mm) - start,
+                ),
+            )
 
         while remaining_bytes > 0 and next_overflow_page is not None:
             overflow_page = self._overflow_page(next_overflow_page)
             data_chunk = overflow_page.overflow_data[:remaining_bytes]
 
-            full_payload += data_chunk
+            payload_chunks.append(data_chunk)
             remaining_bytes -= len(data_chunk)
             next_overflow_page = overflow_page.next_overflow_page
 
-        if leaf_cell.payload_size != len(full_payload):
-            raise ValueError(
-                f"Expected {leaf_cell.payload_size}, but got {len(full_payload)}"
-            )
+        full_payload = b"".join(payload_chunks)
+        if payload_size != len(full_payload):
+            raise ValueError(f"Expected {payload_size}, but got {len(full_payload)}")
 
         return full_payload
 
     def schema_objects(self) -> Iterator[SchemaObject]:
-        for leaf_cell in self._table_cells_tree(starting_page_number=1):
-            full_payload = self._load_full_payload(leaf_cell)
-            schema_table = SchemaObject.from_payload(
-                BytesOffsetArray(full_payload),
-                self.header().encoding,
-            )
-            yield schema_table
+        if self._schema_cache is None:
+            self._schema_cache = [
+                SchemaObject.from_payload(
+                    self._load_full_payload(
+                        payload_size, initial_payload, overflow_page
+                    ),
+                    self._encoding,
+                )
+                for payload_size, _, initial_payload, overflow_page in (
+                    self._table_cells_tree(starting_page_number=1)
+                )
+            ]
+
+        yield from self._schema_cache
 
     def _extract_columns(self, table_sql: str, selected_columns: list[str]):
-        keyword_replace = re.compile(re.escape("domain"), re.IGNORECASE)
-        table_sql = keyword_replace.sub('"domain"', table_sql)
+        cache_key = (table_sql, tuple(selected_columns))
+        if (cached_layout := self._column_layout_cache.get(cache_key)) is not None:
+            return cached_layout
 
-        sql_tokens: list[Token] = [
-            token
-            for token in cast(list[Token], sqlparse.parse(table_sql)[0].tokens)
-            if not token.is_whitespace and not token.is_newline
+        schema_column_names = [
+            _leading_identifier(definition)
+            for definition in _split_definitions(table_sql)
         ]
 
-        schema_column_names: list[str] = []
-        if isinstance(parenthesis_token := sql_tokens[-1], Parenthesis):
-            for token in cast(Iterator[Token], parenthesis_token.get_sublists()):
-                if isinstance(token, IdentifierList):
-                    identifiers = cast(Iterator[Token], token.get_identifiers())
-                    token = list(identifiers)[-1]
-
-                cleaned_value = token.value
-                if cleaned_value[0] == '"' and cleaned_value[-1] == '"':
-                    cleaned_value = cleaned_value[1:-1]
-
-                schema_column_names.append(cleaned_value)
-        else:
-            raise ValueError("Unable to parse columns")
-
         selected_column_indices: list[int] = []
         for selected_column in selected_columns:
             if selected_column not in schema_column_names:
                 raise ValueError(f"Column {selected_column} does not exist")
             selected_column_indices.append(schema_column_names.index(selected_column))
 
+        self._column_layout_cache[cache_key] = (
+            schema_column_names,
+            selected_column_indices,
+        )
         return schema_column_names, selected_column_indices
 
     def _extract_indices(self, index_objects: list[SchemaObject]):
@@ -319,60 +521,41 @@ class SQLiteDatabase:
             if not index_object.root_page:
                 raise ValueError
 
-            sql_tokens: list[Token] = [
-                token
-                for token in cast(
-                    list[Token], sqlparse.parse(index_object.sql)[0].tokens
-                )
-                if not token.is_whitespace and not token.is_newline
-            ]
-
-            if isinstance(function_token := sql_tokens[-1], Function) and isinstance(
-                parenthesis_token := list(function_token.get_sublists())[-1],
-                Parenthesis,
-            ):
-                for token in cast(Iterator[Token], parenthesis_token.get_sublists()):
-                    if isinstance(token, IdentifierList):
-                        identifiers = cast(Iterator[Token], token.get_identifiers())
-                        token = list(identifiers)[-1]
-
-                    column_root_page_map[token.value] = index_object.root_page
-            else:
-                raise ValueError("Unable to parse index")
+            for definition in _split_definitions(index_object.sql):
+                column_name = _leading_identifier(definition)
+                column_root_page_map[column_name] = index_object.root_page
 
         return column_root_page_map
 
     def _record_extractor(self, db_encoding: str, schema_column_names: list[str]):
-        def extract(token: Token, row_record: list[Record]):
+        def extract(token: SqlToken, row_record: list[Record]):
             record_value: Record
-            if isinstance(token, Identifier):
+            if token.kind == SqlTokenKind.IDENTIFIER:
                 column_index = schema_column_names.index(token.value)
                 record_value = row_record[column_index]
+            elif token.kind == SqlTokenKind.STRING:
+                record_value = Record(
+                    type=SerialType.STRING,
+                    data=token.value.encode(db_encoding),
+                )
+            elif token.kind == SqlTokenKind.INTEGER:
+                record_value = Record(
+                    type=SerialType.INT64,
+                    data=int(token.value).to_bytes(),
+                )
             else:
-                if token.ttype is Literal.String.Single:
-                    string_value = token.value[1:-1]
-                    record_value = Record(
-                        type=SerialType.STRING,
-                        data=string_value.encode(db_encoding),
-                    )
-                elif token.ttype is Literal.Number.Integer:
-                    record_value = Record(
-                        type=SerialType.INT64,
-                        data=int(token.value).to_bytes(),
-                    )
-                else:
-                    raise ValueError(f"Unsupported value {token.value}")
+                raise ValueError(f"Unsupported value {token.value}")
 
             return record_value
 
         return extract
 
     def _extract_schema_table_objects(self, table_name: str):
-        related_schema_objects = (
+        related_schema_objects = [
             schema_table
             for schema_table in self.schema_objects()
             if schema_table.tbl_name == table_name
-        )
+        ]
 
         table_schema = next(
             schema_object
@@ -387,13 +570,21 @@ class SQLiteDatabase:
 
         return table_schema, table_index_schema
 
-    def query(
+    def count(self, table_name: str) -> int:
+        table_schema, _ = self._extract_schema_table_objects(table_name)
+        if not table_schema.root_page:
+            raise ValueError(f"Table {table_name} not found in the database")
+
+        return sum(
+            1 for _ in self._table_cells_tree(starting_page_number=table_schema.root_page)
+        )
+
+    def select(
         self,
         table_name: str,
         selected_columns: list[str],
-        conditions: list[tuple[Token, Token]],
-        count_rows: bool = False,
-    ):
+        conditions: list[tuple[SqlToken, SqlToken]],
+    ) -> Iterator[list[str]]:
         table_schema, table_index_schema = self._extract_schema_table_objects(
             table_name
         )
@@ -403,21 +594,18 @@ class SQLiteDatabase:
         linear_row_leaf_cells = self._table_cells_tree(
             starting_page_number=table_schema.root_page
         )
-        if count_rows:
-            yield len(list(linear_row_leaf_cells))
-            return
 
-        db_encoding = self.header().encoding
+        db_encoding = self._encoding
         schema_column_names, selected_column_indices = self._extract_columns(
             table_sql=table_schema.sql,
             selected_columns=selected_columns,
         )
         index_root_page_map = self._extract_indices(table_index_schema)
 
-        indexable_conditions: list[tuple[Identifier, Token]] = []
+        indexable_conditions: list[tuple[SqlToken, SqlToken]] = []
         for left_arg, right_arg in conditions:
-            is_left_identifier = isinstance(left_arg, Identifier)
-            is_right_identifier = isinstance(right_arg, Identifier)
+            is_left_identifier = left_arg.kind == SqlTokenKind.IDENTIFIER
+            is_right_identifier = right_arg.kind == SqlTokenKind.IDENTIFIER
 
             if (is_left_identifier and is_right_identifier) or (
                 not is_left_identifier and not is_right_identifier
@@ -429,7 +617,7 @@ class SQLiteDatabase:
             elif is_right_identifier:
                 indexable_conditions.append((right_arg, left_arg))
 
-        index_condition_groups: list[list[TableBTreeLeafCell]] = []
+        index_condition_groups: list[list[TableLeafCellRaw]] = []
         for condition_identifier, condition_value in indexable_conditions:
             if condition_identifier.value not in index_root_page_map:
                 continue
@@ -437,38 +625,45 @@ class SQLiteDatabase:
             index_root_page = index_root_page_map[condition_identifier.value]
 
             value: bytes
-            if condition_value.ttype is Literal.String.Single:
-                value = condition_value.value[1:-1].encode(db_encoding)
+            if condition_value.kind == SqlTokenKind.STRING:
+                value = condition_value.value.encode(db_encoding)
             else:
                 value = int(condition_value.value).to_bytes(
-                    byteorder="big",
-                    signed=True,
+                    1, "big", signed=True
                 )
 
-            row_ids = self._row_ids_from_index(
-                page_number=index_root_page,
-                lookup_value=value,
+            row_ids = sorted(
+                self._row_ids_from_index(
+                    page_number=index_root_page,
+                    lookup_value=value,
+                )
             )
 
-            filtered_cells: list[TableBTreeLeafCell] = []
-            for id in row_ids:
-                if cell := self._records_by_row_id(table_schema.root_page, id):
-                    filtered_cells.append(cell)
+            filtered_cells = list(
+                self._records_by_row_ids_batch(table_schema.root_page, row_ids)
+            )
 
             index_condition_groups.append(filtered_cells)
 
         if len(index_condition_groups) > 0:
-            filtering_result: list[TableBTreeLeafCell] = index_condition_groups[0]
+            # INFO: Intersected by row id so each extra condition costs one
+            # set lookup per cell instead of a list scan.
+            result_by_row_id = {cell[1]: cell for cell in index_condition_groups[0]}
             for group in index_condition_groups[1:]:
-                for cell in filtering_result:
-                    if cell not in group:
-                        filtering_result.remove(cell)
+                group_row_ids = {cell[1] for cell in group}
+                result_by_row_id = {
+                    row_id: cell
+                    for row_id, cell in result_by_row_id.items()
+                    if row_id in group_row_ids
+                }
 
-            linear_row_leaf_cells = iter(filtering_result)
+            linear_row_leaf_cells = iter(result_by_row_id.values())
 
         record_from_token = self._record_extractor(db_encoding, schema_column_names)
-        for leaf_cell in linear_row_leaf_cells:
-            payload = self._load_full_payload(leaf_cell)
+        for payload_size, row_id, initial_payload, overflow_page in linear_row_leaf_cells:
+            payload = self._load_full_payload(
+                payload_size, initial_payload, overflow_page
+            )
             row_records = parse_records(payload)
 
             matching_row = True
@@ -486,8 +681,8 @@ class SQLiteDatabase:
             result: list[str] = []
             for index in selected_column_indices:
                 if index == 0 and row_records[index].type == SerialType.NULL:
-                    result.append(str(leaf_cell.row_id))
+                    result.append(str(row_id))
                 else:
-                    result.append(row_records[index].data.decode(db_encoding))
+                    result.append(str(row_records[index].data, db_encoding))
 
             yield result
@@ -1,26 +1,17 @@
+import struct
 from collections.abc import Iterable
 from enum import Enum
-from typing import Final, final
+from typing import Final, cast
 
+from .utils import huffman_varint
 from .cell import (
     AnyBTreeCell,
     IndexBTreeInteriorCell,
     IndexBTreeLeafCell,
     TableBTreeInteriorCell,
     TableBTreeLeafCell,
+    TableLeafCellRaw,
 )
-from .utils import BytesOffsetArray, OffsetMetadata
-
-
-@final
-class HeaderOffset:
-    # INFO: https://www.sqlite.org/fileformat.html#b_tree_pages
-    PAGE_TYPE = OffsetMetadata(OFFSET=0, SIZE=1)
-    FIRST_FREEBLOCK = OffsetMetadata(OFFSET=1, SIZE=2)
-    CELLS_COUNT = OffsetMetadata(OFFSET=3, SIZE=2)
-    CELL_CONTENT_START = OffsetMetadata(OFFSET=5, SIZE=2)
-    FRAGMENTED_BYTES = OffsetMetadata(OFFSET=7, SIZE=1)
-    RIGHT_MOST_POINTER = OffsetMetadata(OFFSET=8, SIZE=4)
 
 
 class PageType(Enum):
@@ -30,101 +21,64 @@ class PageType(Enum):
     LEAF_TABLE = 13
 
 
-class BTreeHeader:
-    def __init__(self, data: bytes):
-        self._data: BytesOffsetArray = BytesOffsetArray(data)
-
-    @property
-    def page_type(self) -> PageType:
-        bytes = self._data.subbytes(
-            offset=HeaderOffset.PAGE_TYPE.OFFSET,
-            length=HeaderOffset.PAGE_TYPE.SIZE,
-        )
-        return PageType(bytes[0])
-
-    @property
-    def first_freeblock_start(self) -> int:
-        bytes = self._data.subbytes(
-            offset=HeaderOffset.FIRST_FREEBLOCK.OFFSET,
-            length=HeaderOffset.FIRST_FREEBLOCK.SIZE,
-        )
-        return int.from_bytes(bytes, byteorder="big", signed=False)
+# INFO: https://www.sqlite.org/fileformat.html#b_tree_pages
+# page type, first freeblock, cells count, cell content start, fragmented bytes.
+_BTREE_HEADER = struct.Struct(">BHHHB")
+_RIGHT_MOST_POINTER = struct.Struct(">I")
 
-    @property
-    def cells_count(self) -> int:
-        bytes = self._data.subbytes(
-            offset=HeaderOffset.CELLS_COUNT.OFFSET,
-            length=HeaderOffset.CELLS_COUNT.SIZE,
-        )
-        return int.from_bytes(bytes, byteorder="big", signed=False)
 
-    @property
-    def cell_content_start(self) -> int:
-        bytes = self._data.subbytes(
-            offset=HeaderOffset.CELL_CONTENT_START.OFFSET,
-            length=HeaderOffset.CELL_CONTENT_START.SIZE,
-        )
+class BTreeHeader:
+    def __init__(self, data: memoryview, offset: int = 0):
+        (
+            page_type_value,
+            first_freeblock_start,
+            cells_count,
+            cell_content_start,
+            fragmented_free_bytes,
+        ) = _BTREE_HEADER.unpack_from(data, offset)
 
-        cell_content_start = int.from_bytes(bytes, byteorder="big", signed=False)
         if cell_content_start == 0:
             cell_content_start = 65536
 
-        return cell_content_start
-
-    @property
-    def cell_content_fragmented_free_bytes(self) -> int:
-        bytes = self._data.subbytes(
-            offset=HeaderOffset.CELL_CONTENT_START.OFFSET,
-            length=HeaderOffset.CELL_CONTENT_START.SIZE,
-        )
-        return int(bytes[0])
-
-    @property
-    def right_most_pointer(self) -> int | None:
-        if not self.is_12_byte_header:
-            return None
+        self.page_type: Final[PageType] = PageType(page_type_value)
+        self.first_freeblock_start: Final[int] = first_freeblock_start
+        self.cells_count: Final[int] = cells_count
+        self.cell_content_start: Final[int] = cell_content_start
+        self.cell_content_fragmented_free_bytes: Final[int] = fragmented_free_bytes
 
-        raw_bytes = self._data.subbytes(
-            offset=HeaderOffset.RIGHT_MOST_POINTER.OFFSET,
-            length=HeaderOffset.RIGHT_MOST_POINTER.SIZE,
-        )
-        return int.from_bytes(raw_bytes, byteorder="big", signed=False)
-
-    @property
-    def is_12_byte_header(self) -> bool:
-        return self.page_type in [
+        self.is_12_byte_header: Final[bool] = self.page_type in [
             PageType.INTERIOR_INDEX,
             PageType.INTERIOR_TABLE,
         ]
+        self.right_most_pointer: Final[int | None] = (
+            _RIGHT_MOST_POINTER.unpack_from(data, offset + 8)[0]
+            if self.is_12_byte_header
+            else None
+        )
 
 
 class BTreePage:
-    def __init__(self, page_data: bytes, page_number: int) -> None:
-        self._page_data: BytesOffsetArray = BytesOffsetArray(page_data)
+    def __init__(self, page_data: memoryview, page_number: int) -> None:
+        self._page_data: memoryview = page_data
         self._header_offset: int = 100 if page_number == 1 else 0
 
         self.page_number: Final[int] = page_number
-        self.header: BTreeHeader = BTreeHeader(
-            self._page_data.subbytes(offset=self._header_offset, length=12)
-        )
+        self.header: BTreeHeader = BTreeHeader(page_data, self._header_offset)
 
-    def _cell_pointers(self) -> Iterable[int]:
+    def _cell_pointers(self) -> tuple[int, ...]:
         cell_pointer_offset = self._header_offset + (
             12 if self.header.is_12_byte_header else 8
         )
 
-        for _ in range(self.header.cells_count):
-            raw_bytes = self._page_data.subbytes(
-                offset=cell_pointer_offset,
-                length=2,
-            )
-            yield int.from_bytes(raw_bytes, byteorder="big", signed=False)
-
-            cell_pointer_offset += 2
+        # INFO: One unpack_from call decodes the whole pointer array instead
+        # of one int.from_bytes per cell.
+        return struct.unpack_from(
+            f">{self.header.cells_count}H", self._page_data, cell_pointer_offset
+        )
 
-    def cells(self) -> Iterable[AnyBTreeCell]:
-        cell_pointers = list(self._cell_pointers())
-        asc_sorted_cell_pointers = sorted(self._cell_pointers())
+    def _cell_ranges(self) -> Iterable[tuple[int, int]]:
+        cell_pointers = self._cell_pointers()
+        asc_sorted_cell_pointers = sorted(cell_pointers)
 
         start_to_end_map: dict[int, int] = {}
         for cell_start, cell_end in zip(
@@ -135,29 +89,64 @@ class BTreePage:
             start_to_end_map[cell_start] = cell_end
 
         for cell_start in cell_pointers:
-            cell_end = start_to_end_map[cell_start]
-            raw_bytes = BytesOffsetArray(self._page_data[cell_start:cell_end])
+            yield cell_start, start_to_end_map[cell_start]
+
+    def child_page_for_row_id(self, row_id: int) -> int:
+        if self.header.page_type != PageType.INTERIOR_TABLE:
+            raise ValueError
+
+        # INFO: The pointer array is in key order, so a binary search that
+        # decodes only the probed keys replaces the full interior scan.
+        cell_pointers = self._cell_pointers()
+        page_view = self._page_data
+
+        low, high = 0, len(cell_pointers)
+        while low < high:
+            middle = (low + high) // 2
+            cell_start = cell_pointers[middle]
+
+            integer_key = huffman_varint(page_view, cell_start + 4).value
+            if row_id <= integer_key:
+                high = middle
+            else:
+                low = middle + 1
+
+        if low == len(cell_pointers):
+            return cast(int, self.header.right_most_pointer)
 
-            match self.header.page_type:
-                case PageType.LEAF_TABLE:
-                    yield TableBTreeLeafCell.create(raw_bytes)
-                case PageType.LEAF_INDEX:
-                    yield IndexBTreeLeafCell.create(raw_bytes)
-                case PageType.INTERIOR_TABLE:
-                    yield TableBTreeInteriorCell.create(raw_bytes)
-                case PageType.INTERIOR_INDEX:
-                    yield IndexBTreeInteriorCell.create(raw_bytes)
+        return _RIGHT_MOST_POINTER.unpack_from(page_view, cell_pointers[low])[0]
+
+    def leaf_cells_raw(self) -> Iterable[TableLeafCellRaw]:
+        if self.header.page_type != PageType.LEAF_TABLE:
+            raise ValueError
+
+        page_view = self._page_data
+        for cell_start, cell_end in self._cell_ranges():
+            yield TableBTreeLeafCell.parse_raw(page_view, cell_start, cell_end)
+
+    def cells(self) -> Iterable[AnyBTreeCell]:
+        # INFO: The page type is fixed per page; resolve the cell class once
+        # instead of re-matching it for every cell.
+        create_cell = _CELL_CREATORS[self.header.page_type]
+
+        page_view = self._page_data
+        for cell_start, cell_end in self._cell_ranges():
+            yield create_cell(page_view, cell_start, cell_end)
+
+
+_CELL_CREATORS = {
+    PageType.LEAF_TABLE: TableBTreeLeafCell.create,
+    PageType.LEAF_INDEX: IndexBTreeLeafCell.create,
+    PageType.INTERIOR_TABLE: TableBTreeInteriorCell.create,
+    PageType.INTERIOR_INDEX: IndexBTreeInteriorCell.create,
+}
 
 
 class OverflowPage:
-    def __init__(self, page_data: bytes) -> None:
-        next_page_number = int.from_bytes(
-            page_data[:4],
-            byteorder="big",
-            signed=False,
-        )
+    def __init__(self, page_data: memoryview) -> None:
+        next_page_number = int.from_bytes(page_data[:4], "big")
 
         self.next_overflow_page: Final[int | None] = (
             next_page_number if next_page_number != 0 else None
         )
-        self.overflow_data: Final[bytes] = page_data[4:]
+        self.overflow_data: Final[memoryview] = page_data[4:]
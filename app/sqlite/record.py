@@ -1,11 +1,11 @@
-from dataclasses import dataclass
-from enum import Enum
-from typing import override
+from collections.abc import Iterator
+from enum import IntEnum
+from typing import NamedTuple, override
 
-from .utils import BytesOffsetArray, huffman_varint
+from .utils import be_int, huffman_varint
 
 
-class SerialType(Enum):
+class SerialType(IntEnum):
     NULL = 0
     INT8 = 1
     INT16 = 2
@@ -22,21 +22,28 @@ class SerialType(Enum):
     STRING = 13
 
 
-@dataclass
-class Record:
+# INFO: A NamedTuple rather than a dataclass: tuple construction skips
+# per-attribute __init__ assignment, and records are created once per
+# column of every scanned row.
+INT_SERIAL_TYPES = frozenset(
+    {
+        SerialType.INT8,
+        SerialType.INT16,
+        SerialType.INT24,
+        SerialType.INT32,
+        SerialType.INT48,
+        SerialType.INT64,
+    }
+)
+
+
+class Record(NamedTuple):
     type: SerialType
-    data: bytes
+    data: bytes | memoryview
 
     @property
     def is_int(self):
-        return self.type in [
-            SerialType.INT8,
-            SerialType.INT16,
-            SerialType.INT24,
-            SerialType.INT32,
-            SerialType.INT48,
-            SerialType.INT64,
-        ]
+        return self.type in INT_SERIAL_TYPES
 
     @override
     def __eq__(self, value: object, /) -> bool:
@@ -44,69 +51,76 @@ class Record:
             return False
 
         if self.is_int and value.is_int:
-            left_valule = int.from_bytes(self.data, byteorder="big", signed=True)
-            right_value = int.from_bytes(value.data, byteorder="big", signed=True)
-            return left_valule == right_value
+            return be_int(self.data) == be_int(value.data)
         else:
             return self.data == value.data and self.type == value.type
 
+    @override
+    def __ne__(self, value: object, /) -> bool:
+        # INFO: tuple defines __ne__, so without this override != would
+        # bypass the custom __eq__ above and compare element-wise.
+        return not self.__eq__(value)
+
+
+# INFO: (serial type, content size) for the twelve fixed serial types;
+# https://www.sqlite.org/fileformat.html#record_format
+_FIXED_SERIAL_TYPES: tuple[tuple[SerialType, int], ...] = (
+    (SerialType.NULL, 0),
+    (SerialType.INT8, 1),
+    (SerialType.INT16, 2),
+    (SerialType.INT24, 3),
+    (SerialType.INT32, 4),
+    (SerialType.INT48, 6),
+    (SerialType.INT64, 8),
+    (SerialType.FLOAT64, 8),
+    (SerialType.INT_ZERO, 0),
+    (SerialType.INT_ONE, 0),
+    (SerialType.RESERVED1, 0),
+    (SerialType.RESERVED2, 0),
+)
+
 
 def _parse_header(value: int) -> tuple[SerialType, int]:
-    match value:
-        case SerialType.NULL.value:
-            return (SerialType(value), 0)
-        case SerialType.INT8.value:
-            return (SerialType(value), 1)
-        case SerialType.INT16.value:
-            return (SerialType(value), 2)
-        case SerialType.INT24.value:
-            return (SerialType(value), 3)
-        case SerialType.INT32.value:
-            return (SerialType(value), 4)
-        case SerialType.INT48.value:
-            return (SerialType(value), 6)
-        case SerialType.INT64.value:
-            return (SerialType(value), 8)
-        case SerialType.FLOAT64.value:
-            return (SerialType(value), 8)
-        case SerialType.INT_ZERO.value:
-            return (SerialType(value), 0)
-        case SerialType.INT_ONE.value:
-            return (SerialType(value), 0)
-        case SerialType.RESERVED1.value:
-            return (SerialType(value), 0)
-        case SerialType.RESERVED2.value:
-            return (SerialType(value), 0)
-        case _ if value >= 12 and value % 2 == 0:
-            return (SerialType.BLOB, (value - 12) // 2)
-        case _ if value >= 13 and value % 2 == 1:
-            return (SerialType.STRING, (value - 13) // 2)
-        case _:
+    if value < 12:
+        if value < 0:
             raise ValueError
-
-
-def parse_records(payload: bytes) -> list[Record]:
-    header_size_varint = huffman_varint(payload[:9])
-    header_bytes, body_bytes = (
-        BytesOffsetArray(payload[: header_size_varint.value]),
-        BytesOffsetArray(payload[header_size_varint.value :]),
-    )
-
-    header_offset = header_size_varint.length
-    body_offset = 0
-
-    records: list[Record] = []
-    while header_offset < len(header_bytes):
-        header_varint = huffman_varint(
-            header_bytes.subbytes(offset=header_offset, length=9),
-        )
+        return _FIXED_SERIAL_TYPES[value]
+
+    # INFO: Past the fixed entries an odd value is a string, an even one a
+    # blob, and the content size is packed into the remaining bits.
+    if value & 1:
+        return (SerialType.STRING, (value - 13) >> 1)
+    return (SerialType.BLOB, (value - 12) >> 1)
+
+
+def iter_records(
+    payload: bytes | memoryview,
+    # INFO: Default-arg bindings turn the per-column global lookups in the
+    # loop below into local loads.
+    _varint=huffman_varint,
+    _parse_header=_parse_header,
+    _record=Record,
+) -> Iterator[Record]:
+    # INFO: Normalizing to a memoryview makes every slice below zero-copy.
+    payload = memoryview(payload)
+
+    header_size, header_offset = _varint(payload)
+
+    # INFO: Streaming: single-scan callers never pay for a record list.
+    # Header varints and body fields advance two plain integer offsets
+    # into the same payload view.
+    body_offset = header_size
+    while header_offset < header_size:
+        header_varint = _varint(payload, header_offset)
+        header_offset += header_varint.length
 
         serial_type, size = _parse_header(header_varint.value)
-        data = body_bytes.subbytes(offset=body_offset, length=size)
-
-        records.append(Record(type=serial_type, data=data))
-
+        yield _record(
+            type=serial_type,
+            data=payload[body_offset : body_offset + size],
+        )
         body_offset += size
-        header_offset += header_varint.length
 
-    return records
+
+def parse_records(payload: bytes | memoryview) -> list[Record]:
+    return list(iter_records(payload))
@@ -1,8 +1,44 @@
+import codecs
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 
-from .record import SerialType, parse_records
-from .utils import BytesOffsetArray
+from .record import INT_SERIAL_TYPES, SerialType, parse_records
+from .utils import be_int
+
+
+@lru_cache(maxsize=4)
+def _text_decoder(encoding: str):
+    # INFO: Identifiers and SQL text are ASCII in practice, and ASCII is a
+    # strict subset of UTF-8, so try the tightest decode loop first.
+    if encoding in ("utf-8", "utf8"):
+
+        def decode_utf8(data: bytes | memoryview) -> str:
+            try:
+                return str(data, "ascii")
+            except UnicodeDecodeError:
+                return str(data, "utf-8")
+
+        return decode_utf8
+
+    # INFO: One codec lookup per encoding instead of one per decoded
+    # string; the returned callable also accepts memoryviews directly.
+    codec_decode = codecs.lookup(encoding).decode
+
+    def decode(data: bytes | memoryview) -> str:
+        return codec_decode(data)[0]
+
+    return decode
+
+
+# INFO: The four text columns of a schema row (type, name, tbl_name,
+# sql) packed into one int, 8 bits per column.
+_TEXT_COLUMNS_SIGNATURE = (
+    SerialType.STRING
+    | (SerialType.STRING << 8)
+    | (SerialType.STRING << 16)
+    | (SerialType.STRING << 24)
+)
 
 
 class SchemaObjectType(Enum):
@@ -12,7 +48,7 @@ class SchemaObjectType(Enum):
     TRIGGER = "trigger"
 
 
-@dataclass
+@dataclass(slots=True)
 class SchemaObject:
     type: SchemaObjectType
     name: str
@@ -29,27 +65,34 @@ class SchemaObject:
         return self.type == SchemaObjectType.INDEX
 
     @staticmethod
-    def from_payload(payload: BytesOffsetArray, encoding: str):
+    def from_payload(payload: bytes | memoryview, encoding: str):
         object_type, object_name, table_name, root_page, sql, *rest = parse_records(
             payload
         )
+        # INFO: One packed comparison replaces four separate type checks;
+        # root_page stays separate because any integer type is valid there.
+        types_signature = (
+            object_type.type
+            | (object_name.type << 8)
+            | (table_name.type << 16)
+            | (sql.type << 24)
+        )
         if (
             len(rest) > 0
-            or object_type.type != SerialType.STRING
-            or object_name.type != SerialType.STRING
-            or table_name.type != SerialType.STRING
-            or not root_page.is_int
-            or sql.type != SerialType.STRING
+            or types_signature != _TEXT_COLUMNS_SIGNATURE
+            or root_page.type not in INT_SERIAL_TYPES
         ):
             raise ValueError("Schema is corrupted")
 
-        object_type = SchemaObjectType(object_type.data.decode("ascii"))
-        root_page = int.from_bytes(root_page.data, byteorder="big", signed=False)
+        decode = _text_decoder(encoding)
+        object_type = SchemaObjectType(str(object_type.data, "ascii"))
+        root_page = be_int(root_page.data)
 
+        # INFO: Bytes are materialized only here, at the decode boundary.
         return SchemaObject(
             type=object_type,
-            name=object_name.data.decode(encoding),
-            tbl_name=table_name.data.decode(encoding),
+            name=decode(object_name.data),
+            tbl_name=decode(table_name.data),
             root_page=root_page,
-            sql=sql.data.decode(encoding),
+            sql=decode(sql.data),
         )
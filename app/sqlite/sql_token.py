@@ -0,0 +1,17 @@
+from enum import Enum
+from typing import NamedTuple
+
+
+class SqlTokenKind(Enum):
+    KEYWORD = "keyword"
+    IDENTIFIER = "identifier"
+    STRING = "string"
+    INTEGER = "integer"
+    SYMBOL = "symbol"
+    WILDCARD = "wildcard"
+    PLACEHOLDER = "placeholder"
+
+
+class SqlToken(NamedTuple):
+    kind: SqlTokenKind
+    value: str
@@ -1,10 +1,4 @@
-from typing import NamedTuple, final
-
-
-@final
-class OffsetMetadata(NamedTuple):
-    OFFSET: int
-    SIZE: int
+from typing import NamedTuple
 
 
 class HuffmanResult(NamedTuple):
@@ -12,24 +6,83 @@ class HuffmanResult(NamedTuple):
     length: int
 
 
-def huffman_varint(bytes: bytes) -> HuffmanResult:
-    if len(bytes) < 1 or len(bytes) > 9:
-        raise ValueError
+def huffman_varint(buffer: bytes | memoryview, offset: int = 0) -> HuffmanResult:
+    # INFO: Fully unrolled over SQLite's nine possible varint lengths;
+    # straight-line compares are cheaper in CPython than any loop or
+    # wide-window arithmetic. Short lengths come first because record
+    # headers are dominated by one- and two-byte varints. Decoding starts
+    # at offset so callers never have to slice a window out first.
+    try:
+        byte = buffer[offset]
+        if byte < 0b_1000_0000:
+            return HuffmanResult(byte, 1)
+        value = byte & 0b_0111_1111
+
+        byte = buffer[offset + 1]
+        if byte < 0b_1000_0000:
+            return HuffmanResult((value << 7) | byte, 2)
+        value = (value << 7) | (byte & 0b_0111_1111)
+
+        byte = buffer[offset + 2]
+        if byte < 0b_1000_0000:
+            return HuffmanResult((value << 7) | byte, 3)
+        value = (value << 7) | (byte & 0b_0111_1111)
+
+        byte = buffer[offset + 3]
+        if byte < 0b_1000_0000:
+            return HuffmanResult((value << 7) | byte, 4)
+        value = (value << 7) | (byte & 0b_0111_1111)
+
+        byte = buffer[offset + 4]
+        if byte < 0b_1000_0000:
+            return HuffmanResult((value << 7) | byte, 5)
+        value = (value << 7) | (byte & 0b_0111_1111)
+
+        byte = buffer[offset + 5]
+        if byte < 0b_1000_0000:
+            return HuffmanResult((value << 7) | byte, 6)
+        value = (value << 7) | (byte & 0b_0111_1111)
+
+        byte = buffer[offset + 6]
+        if byte < 0b_1000_0000:
+            return HuffmanResult((value << 7) | byte, 7)
+        value = (value << 7) | (byte & 0b_0111_1111)
 
-    def is_last(byte: int):
-        return not bool(byte >> 7)
+        byte = buffer[offset + 7]
+        if byte < 0b_1000_0000:
+            return HuffmanResult((value << 7) | byte, 8)
+        value = (value << 7) | (byte & 0b_0111_1111)
 
-    last_varint_byte_index = next(
-        index for index, byte in enumerate(bytes) if is_last(byte)
-    )
+        # INFO: The ninth byte has no continuation flag - all 8 bits count.
+        return HuffmanResult((value << 8) | buffer[offset + 8], 9)
+    except IndexError:
+        raise ValueError("Varint missing a terminator byte") from None
 
-    value, length = 0, last_varint_byte_index + 1
-    for byte in bytes[:length]:
-        value = (value << 7) | (0b_0111_1111 & byte)
 
-    return HuffmanResult(value, length)
+def be_int(data: bytes | memoryview) -> int:
+    # INFO: Direct arithmetic beats int.from_bytes for the small widths
+    # SQLite record integers come in; all of them are big-endian signed.
+    length = len(data)
+    if length == 1:
+        value = data[0]
+        return value - 0x100 if value & 0x80 else value
+    if length == 2:
+        value = (data[0] << 8) | data[1]
+        return value - 0x1_0000 if value & 0x8000 else value
+    if length == 3:
+        value = (data[0] << 16) | (data[1] << 8) | data[2]
+        return value - 0x100_0000 if value & 0x80_0000 else value
+    if length == 4:
+        value = (data[0] << 24) | (data[1] << 16) | (data[2] << 8) | data[3]
+        return value - 0x1_0000_0000 if value & 0x8000_0000 else value
+    if length == 0:
+        return 0
+    return int.from_bytes(data, "big", signed=True)
 
 
-class BytesOffsetArray(bytes):
-    def subbytes(self, offset: int, length: int) -> bytes:
-        return self[offset : (offset + length)]
+try:
+    # INFO: Prefer the C decoder when the optional extension has been built
+    # (python setup.py build_ext --inplace); same signature and result shape.
+    from ._varint import huffman_varint  # pyright: ignore[reportAssignmentType]
+except ImportError:
+    pass
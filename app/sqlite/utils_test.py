@@ -1,6 +1,6 @@
 import unittest
 
-from .utils import huffman_varint
+from .utils import be_int, huffman_varint
 
 
 class TestUtils(unittest.TestCase):
@@ -25,6 +25,36 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(3, result.length)
         self.assertEqual(expectedValue, result.value)
 
+    def test_nine_byte_varint_uses_all_bits_of_last_byte(self):
+        # INFO: The ninth byte has no continuation flag, so all 8 of its
+        # bits contribute to the value.
+        result = huffman_varint(bytes([0xFF] * 9))
+        self.assertEqual(9, result.length)
+        self.assertEqual((1 << 64) - 1, result.value)
+
+    def test_varint_at_offset(self):
+        result = huffman_varint(bytes([0xFF, 0xFF, 0b_0101_0110]), offset=2)
+        self.assertEqual(1, result.length)
+        self.assertEqual(0b_0101_0110, result.value)
+
+    def test_varint_without_terminator(self):
+        with self.assertRaises(ValueError):
+            _ = huffman_varint(bytes([0b_1000_0001] * 3))
+
+
+class TestBeInt(unittest.TestCase):
+    def test_positive_values(self):
+        self.assertEqual(0, be_int(b""))
+        self.assertEqual(0x42, be_int(bytes([0x42])))
+        self.assertEqual(0x0102, be_int(bytes([0x01, 0x02])))
+        self.assertEqual(0x010203, be_int(bytes([0x01, 0x02, 0x03])))
+        self.assertEqual(0x01020304, be_int(bytes([0x01, 0x02, 0x03, 0x04])))
+
+    def test_negative_values(self):
+        self.assertEqual(-1, be_int(bytes([0xFF])))
+        self.assertEqual(-2, be_int(bytes([0xFF, 0xFE])))
+        self.assertEqual(-1, be_int(bytes([0xFF] * 8)))
+
 
 if __name__ == "__main__":
     _ = unittest.main()
@@ -0,0 +1,12 @@
+# INFO: Only used to build the optional _varint C extension in place:
+#   python setup.py build_ext --inplace
+# The app runs fine without it; utils.py falls back to pure Python.
+from setuptools import Extension, setup
+
+setup(
+    name="codecrafters-sqlite",
+    version="0.1.0",
+    ext_modules=[
+        Extension("app.sqlite._varint", sources=["app/sqlite/_varint.c"]),
+    ],
+)